@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import time
+from functools import wraps
+
+import orjson
+from dotenv import load_dotenv
+from redis import asyncio as aioredis
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from .database import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_PREFIX = "estuary"
+
+# Expiry (seconds) per endpoint family
+POINTS_TTL = 3600    # survey coordinates are effectively static
+ESTUARY_TTL = 300    # per-estuary aggregates
+
+# Stale-while-revalidate: after the TTL an entry is served stale (and
+# refreshed in the background) for this long, then refreshed inline
+ESTUARY_STALE_TTL = 3600
+# Entries are kept this long as a fallback for when Postgres is down
+LAST_GOOD_TTL = 7 * 24 * 3600
+REFRESH_LOCK_TTL = 30
+
+redis = aioredis.from_url(REDIS_URL)
+
+
+async def clear_cache():
+    keys = [key async for key in redis.scan_iter(match=f"{CACHE_PREFIX}:*")]
+    if not keys:
+        return 0
+
+    return await redis.delete(*keys)
+
+
+# =========================
+# Stale-while-revalidate
+# =========================
+# Background refresh tasks; held so they aren't garbage collected mid-run
+_refresh_tasks = set()
+
+
+def _swr_key(func, params):
+    args = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return f"{CACHE_PREFIX}:swr:{func.__name__}:{args}"
+
+
+def _render(value):
+    if isinstance(value, Response):
+        return value.body
+    return orjson.dumps(jsonable_encoder(value))
+
+
+def _serve(entry, state):
+    return Response(
+        content=entry["body"],
+        status_code=entry["status"],
+        media_type="application/json",
+        headers={"X-Cache": state},
+    )
+
+
+async def _read_entry(key):
+    try:
+        entry = await redis.hgetall(key)
+    except Exception:
+        logger.warning(f"Error reading cache key '{key}'", exc_info=True)
+        return None
+
+    if not entry:
+        return None
+
+    return {
+        "body": entry[b"body"],
+        "status": int(entry[b"status"]),
+        "generated_at": float(entry[b"generated_at"]),
+        "stale_at": float(entry[b"stale_at"]),
+        "expires_at": float(entry[b"expires_at"]),
+    }
+
+
+def swr_cache(fresh=ESTUARY_TTL, stale=ESTUARY_STALE_TTL, retain_if=None):
+    """Cache a JSON endpoint in a Redis hash (body, status, generated_at,
+    stale_at, expires_at).
+
+    Fresh entries are served as-is; stale ones are served while a background
+    task regenerates them. Past expires_at the handler runs inline, and if
+    that fails (e.g. Postgres is down) the last good body is served instead.
+    The wrapped handler must take its session as ``db``.
+
+    ``retain_if(**params)`` decides whether an entry is kept as a long-lived
+    last-good fallback; entries it rejects (e.g. unknown estuary names) just
+    expire after ``fresh`` seconds.
+    """
+    def decorator(func):
+        async def refresh(key, params, db=None):
+            if db is None:
+                async with SessionLocal() as db:
+                    value = await func(**params, db=db)
+            else:
+                value = await func(**params, db=db)
+
+            now = time.time()
+            entry = {
+                "body": _render(value),
+                "status": 200,
+                "generated_at": now,
+                "stale_at": now + fresh,
+                "expires_at": now + fresh + stale,
+            }
+            retain = retain_if is None or retain_if(**params)
+            try:
+                await redis.hset(key, mapping=entry)
+                await redis.expire(key, LAST_GOOD_TTL if retain else fresh)
+            except Exception:
+                logger.warning(f"Error setting cache key '{key}'", exc_info=True)
+
+            return entry
+
+        async def refresh_in_background(key, params):
+            lock = f"{key}:lock"
+            try:
+                if not await redis.set(lock, 1, nx=True, ex=REFRESH_LOCK_TTL):
+                    return  # another request/worker is already refreshing
+
+                try:
+                    await refresh(key, params)
+                finally:
+                    await redis.delete(lock)
+            except Exception:
+                logger.warning(f"Background refresh of '{key}' failed", exc_info=True)
+
+        @wraps(func)
+        async def wrapper(**kwargs):
+            db = kwargs.pop("db")
+            key = _swr_key(func, kwargs)
+            entry = await _read_entry(key)
+            now = time.time()
+
+            if entry and now < entry["stale_at"]:
+                return _serve(entry, "HIT")
+
+            if entry and now < entry["expires_at"]:
+                task = asyncio.create_task(refresh_in_background(key, kwargs))
+                _refresh_tasks.add(task)
+                task.add_done_callback(_refresh_tasks.discard)
+                return _serve(entry, "STALE")
+
+            try:
+                fresh_entry = await refresh(key, kwargs, db=db)
+            except Exception:
+                if entry is None:
+                    raise
+                logger.warning(f"Refresh of '{key}' failed, serving last good", exc_info=True)
+                return _serve(entry, "STALE")
+
+            return _serve(fresh_entry, "MISS")
+
+        async def warm(**params):
+            await refresh(_swr_key(func, params), params)
+
+        wrapper.warm = warm
+        return wrapper
+
+    return decorator
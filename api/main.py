@@ -1,21 +1,452 @@
-from fastapi import FastAPI, Depends
-from fastapi.responses import JSONResponse, FileResponse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+import msgspec
+from fastapi import FastAPI, Depends, Header, HTTPException
+from fastapi.responses import ORJSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
 
 from pathlib import Path
 
-from .database import SessionLocal
-from .models import SurveyPoints
-from .schemas import SurveyPointBase
+from .cache import POINTS_TTL, clear_cache, swr_cache
+from .database import SessionLocal, get_db, warm_pool
+from .schemas import (
+    ColorBreakdown,
+    ColorPoint,
+    EstuaryColor,
+    EstuarySize,
+    SizeBreakdown,
+    SizePoint,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Features are streamed in batches of this many rows
+GEOJSON_BATCH_SIZE = 500
+
+# lat/long are Decimal (NUMERIC columns); emit them as JSON numbers
+_json_encoder = msgspec.json.Encoder(decimal_format="number")
+
+# =========================
+# SQL (compiled once at import)
+# =========================
+# Built in Postgres; same fields as SurveyPointBase
+_SQL_SURVEY_POINTS = text("""
+    SELECT coalesce(
+        jsonb_agg(
+            jsonb_build_object(
+                'estuary_id', sp.estuary_id,
+                'station_code', sp.station_code,
+                'location', sp.location,
+                'latitude', sp.latitude,
+                'longitude', sp.longitude,
+                'survey_date', sp.survey_date
+            )
+        ),
+        '[]'::jsonb
+    ) AS points
+    FROM survey.survey_points sp;
+""").columns(points=JSONB)
+
+# Pre-rendered by the survey.survey_point_features materialised view
+# (sql/003_survey_point_features.sql)
+_SQL_POINT_FEATURES = text("""
+    SELECT feature
+    FROM survey.survey_point_features
+    ORDER BY id;
+""")
+
+_SQL_ESTUARY_DATA = text("""
+    SELECT
+        COUNT(*) AS n,
+        AVG(pa.water_abundance) AS average_water_abundance,
+        AVG(pa.sediment_abundance) AS average_sediment_abundance,
+        jsonb_agg(
+            jsonb_build_object(
+                'point_id', sp.point_id,
+                'station_code', sp.station_code,
+                'latitude', sp.latitude,
+                'longitude', sp.longitude,
+                'water_abundance', pa.water_abundance,
+                'sediment_abundance', pa.sediment_abundance
+            )
+        ) AS points
+    FROM survey.survey_points sp
+    LEFT JOIN survey.plastic_abundance pa
+        ON sp.station_code = pa.station_code
+    WHERE sp.estuary_name = :estuary
+""").columns(points=JSONB)
+
+# Whole response built in Postgres; empty estuaries get points [] / average {}
+_SQL_ESTUARY_SHAPE = text("""
+    SELECT jsonb_build_object(
+        'estuary', CAST(:estuary AS text),
+        'points', coalesce(jsonb_agg(
+            jsonb_build_object(
+                'station_code', sp.station_code,
+                'latitude', sp.latitude,
+                'longitude', sp.longitude,
+                'water', jsonb_build_object(
+                    'fiber', w.fiber,
+                    'fragment', w.fragment,
+                    'film', w.film,
+                    'foam', w.foam,
+                    'pellet', w.pellet
+                ),
+                'sediment', jsonb_build_object(
+                    'fiber', s.fiber,
+                    'fragment', s.fragment,
+                    'film', s.film,
+                    'foam', s.foam,
+                    'pellet', s.pellet
+                )
+            )
+        ), '[]'::jsonb),
+        'average', CASE WHEN COUNT(*) = 0 THEN '{}'::jsonb ELSE jsonb_build_object(
+            'water', jsonb_build_object(
+                'fiber', ROUND(AVG(w.fiber)::numeric, 2),
+                'fragment', ROUND(AVG(w.fragment)::numeric, 2),
+                'film', ROUND(AVG(w.film)::numeric, 2),
+                'foam', ROUND(AVG(w.foam)::numeric, 2),
+                'pellet', ROUND(AVG(w.pellet)::numeric, 2)
+            ),
+            'sediment', jsonb_build_object(
+                'fiber', ROUND(AVG(s.fiber)::numeric, 2),
+                'fragment', ROUND(AVG(s.fragment)::numeric, 2),
+                'film', ROUND(AVG(s.film)::numeric, 2),
+                'foam', ROUND(AVG(s.foam)::numeric, 2),
+                'pellet', ROUND(AVG(s.pellet)::numeric, 2)
+            )
+        ) END
+    ) AS shape
+    FROM survey.survey_points sp
+    JOIN survey.plastic_shape_water w
+        ON sp.station_code = w.station_code
+    JOIN survey.plastic_shape_sediment s
+        ON sp.station_code = s.station_code
+    WHERE sp.estuary_name = :estuary;
+""").columns(shape=JSONB)
+
+_SQL_ESTUARY_COLOR = text("""
+    SELECT
+        sp.station_code,
+        sp.latitude,
+        sp.longitude,
+        cw.black AS w_black,
+        cw.red AS w_red,
+        cw.blue AS w_blue,
+        cw.yellow AS w_yellow,
+        cw.grey AS w_grey,
+        cw.white AS w_white,
+        cw.green AS w_green,
+        cw.orange AS w_orange,
+        cw.brown AS w_brown,
+        cw.transparent AS w_transparent,
+        cs.black AS s_black,
+        cs.red AS s_red,
+        cs.blue AS s_blue,
+        cs.yellow AS s_yellow,
+        cs.grey AS s_grey,
+        cs.white AS s_white,
+        cs.green AS s_green,
+        cs.orange AS s_orange,
+        cs.brown AS s_brown,
+        cs.transparent AS s_transparent
+    FROM survey.survey_points sp
+    LEFT JOIN survey.plastic_color_water cw
+        ON sp.station_code = cw.station_code
+    LEFT JOIN survey.plastic_color_sediment cs
+        ON sp.station_code = cs.station_code
+    WHERE sp.estuary_name = :estuary
+    ORDER BY sp.station_code;
+""")
+
+_SQL_ESTUARY_SIZE = text("""
+    SELECT
+        sp.station_code,
+        sp.latitude,
+        sp.longitude,
+        COALESCE(sw.lt_1mm, 0) AS w_lt_1mm,
+        COALESCE(sw.mm_1_to_2_5, 0) AS w_mm_1_to_2_5,
+        COALESCE(sw.mm_2_5_to_5, 0) AS w_mm_2_5_to_5,
+        COALESCE(ss.lt_1mm, 0) AS s_lt_1mm,
+        COALESCE(ss.mm_1_to_2_5, 0) AS s_mm_1_to_2_5,
+        COALESCE(ss.mm_2_5_to_5, 0) AS s_mm_2_5_to_5
+    FROM survey.survey_points sp
+    LEFT JOIN survey.plastic_size_water sw
+        ON sp.station_code = sw.station_code
+    LEFT JOIN survey.plastic_size_sediment ss
+        ON sp.station_code = ss.station_code
+    WHERE sp.estuary_name = :estuary
+    ORDER BY sp.station_code;
+""")
+
+# shape + color + size for one estuary in a single round-trip; the sp CTE
+# is scanned once and shared. Each part matches its standalone endpoint.
+_SQL_ESTUARY_ALL = text("""
+    WITH sp AS (
+        SELECT station_code, latitude, longitude
+        FROM survey.survey_points
+        WHERE estuary_name = :estuary
+    )
+    SELECT jsonb_build_object(
+        'shape', (
+            SELECT jsonb_build_object(
+                'estuary', CAST(:estuary AS text),
+                'points', coalesce(jsonb_agg(
+                    jsonb_build_object(
+                        'station_code', sp.station_code,
+                        'latitude', sp.latitude,
+                        'longitude', sp.longitude,
+                        'water', jsonb_build_object(
+                            'fiber', w.fiber,
+                            'fragment', w.fragment,
+                            'film', w.film,
+                            'foam', w.foam,
+                            'pellet', w.pellet
+                        ),
+                        'sediment', jsonb_build_object(
+                            'fiber', s.fiber,
+                            'fragment', s.fragment,
+                            'film', s.film,
+                            'foam', s.foam,
+                            'pellet', s.pellet
+                        )
+                    )
+                ), '[]'::jsonb),
+                'average', CASE WHEN COUNT(*) = 0 THEN '{}'::jsonb ELSE jsonb_build_object(
+                    'water', jsonb_build_object(
+                        'fiber', ROUND(AVG(w.fiber)::numeric, 2),
+                        'fragment', ROUND(AVG(w.fragment)::numeric, 2),
+                        'film', ROUND(AVG(w.film)::numeric, 2),
+                        'foam', ROUND(AVG(w.foam)::numeric, 2),
+                        'pellet', ROUND(AVG(w.pellet)::numeric, 2)
+                    ),
+                    'sediment', jsonb_build_object(
+                        'fiber', ROUND(AVG(s.fiber)::numeric, 2),
+                        'fragment', ROUND(AVG(s.fragment)::numeric, 2),
+                        'film', ROUND(AVG(s.film)::numeric, 2),
+                        'foam', ROUND(AVG(s.foam)::numeric, 2),
+                        'pellet', ROUND(AVG(s.pellet)::numeric, 2)
+                    )
+                ) END
+            )
+            FROM sp
+            JOIN survey.plastic_shape_water w
+                ON sp.station_code = w.station_code
+            JOIN survey.plastic_shape_sediment s
+                ON sp.station_code = s.station_code
+        ),
+        'color', (
+            SELECT jsonb_build_object(
+                'estuary', CAST(:estuary AS text),
+                'points', coalesce(jsonb_agg(
+                    jsonb_build_object(
+                        'station_code', sp.station_code,
+                        'latitude', sp.latitude,
+                        'longitude', sp.longitude,
+                        'water', jsonb_build_object(
+                            'black', cw.black,
+                            'red', cw.red,
+                            'blue', cw.blue,
+                            'yellow', cw.yellow,
+                            'grey', cw.grey,
+                            'white', cw.white,
+                            'green', cw.green,
+                            'orange', cw.orange,
+                            'brown', cw.brown,
+                            'transparent', cw.transparent
+                        ),
+                        'sediment', jsonb_build_object(
+                            'black', cs.black,
+                            'red', cs.red,
+                            'blue', cs.blue,
+                            'yellow', cs.yellow,
+                            'grey', cs.grey,
+                            'white', cs.white,
+                            'green', cs.green,
+                            'orange', cs.orange,
+                            'brown', cs.brown,
+                            'transparent', cs.transparent
+                        )
+                    )
+                    ORDER BY sp.station_code
+                ), '[]'::jsonb)
+            )
+            FROM sp
+            LEFT JOIN survey.plastic_color_water cw
+                ON sp.station_code = cw.station_code
+            LEFT JOIN survey.plastic_color_sediment cs
+                ON sp.station_code = cs.station_code
+        ),
+        'size', (
+            SELECT jsonb_build_object(
+                'estuary', CAST(:estuary AS text),
+                'points', coalesce(jsonb_agg(
+                    jsonb_build_object(
+                        'station_code', sp.station_code,
+                        'latitude', sp.latitude,
+                        'longitude', sp.longitude,
+                        'water', jsonb_build_object(
+                            'lt_1mm', COALESCE(sw.lt_1mm, 0),
+                            'mm_1_to_2_5', COALESCE(sw.mm_1_to_2_5, 0),
+                            'mm_2_5_to_5', COALESCE(sw.mm_2_5_to_5, 0)
+                        ),
+                        'sediment', jsonb_build_object(
+                            'lt_1mm', COALESCE(ss.lt_1mm, 0),
+                            'mm_1_to_2_5', COALESCE(ss.mm_1_to_2_5, 0),
+                            'mm_2_5_to_5', COALESCE(ss.mm_2_5_to_5, 0)
+                        )
+                    )
+                    ORDER BY sp.station_code
+                ), '[]'::jsonb)
+            )
+            FROM sp
+            LEFT JOIN survey.plastic_size_water sw
+                ON sp.station_code = sw.station_code
+            LEFT JOIN survey.plastic_size_sediment ss
+                ON sp.station_code = ss.station_code
+        )
+    ) AS all_data;
+""").columns(all_data=JSONB)
+
+_SQL_ESTUARY_NAMES = text("""
+    SELECT DISTINCT estuary_name
+    FROM survey.survey_points
+    WHERE estuary_name IS NOT NULL;
+""")
+
+_SQL_DATA_VERSION = text("SELECT version FROM survey.data_version")
+
+_SQL_BUMP_DATA_VERSION = text(
+    "UPDATE survey.data_version SET version = version + 1, updated_at = now()"
+)
+
+_SQL_REFRESH_FEATURES = text(
+    "REFRESH MATERIALIZED VIEW CONCURRENTLY survey.survey_point_features"
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    tasks = [
+        asyncio.create_task(warm_up()),
+        asyncio.create_task(refresh_known_estuaries()),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
 
 
-app = FastAPI(title="Microplastics API")
+app = FastAPI(
+    title="Microplastics API",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
 # =========================
-# CORS
+# Response Cache
+# =========================
+CACHE_ADMIN_TOKEN = os.getenv("CACHE_ADMIN_TOKEN")
+
+
+@app.delete("/cache")
+async def invalidate_cache(
+    x_admin_token: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    # Call after loading new survey data
+    if not CACHE_ADMIN_TOKEN or x_admin_token != CACHE_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    await db.execute(_SQL_REFRESH_FEATURES)
+    await db.execute(_SQL_BUMP_DATA_VERSION)
+    await db.commit()
+    _etag["loaded_at"] = None  # re-read the bumped version
+    await load_known_estuaries(db)
+
+    return {"cleared": await clear_cache()}
+
+# =========================
+# Client-side Caching (ETag)
+# =========================
+CLIENT_CACHED_PATHS = {"/survey-points", "/survey/points/geojson"}
+CLIENT_CACHE_CONTROL = f"public, max-age={POINTS_TTL}"
+# Other workers pick up a bumped data version within this many seconds
+DATA_VERSION_TTL = 60
+
+_etag = {"value": None, "loaded_at": None}
+
+
+async def current_etag():
+    # None when the version can't be read; callers then send no ETag
+    now = time.monotonic()
+    if _etag["loaded_at"] is None or now - _etag["loaded_at"] > DATA_VERSION_TTL:
+        try:
+            async with SessionLocal() as db:
+                version = (await db.execute(_SQL_DATA_VERSION)).scalar()
+        except Exception:
+            # Keep the last good ETag (if any) and retry after DATA_VERSION_TTL
+            # rather than hitting the DB on every request
+            logger.warning("Could not read survey.data_version", exc_info=True)
+        else:
+            _etag["value"] = f'"{hashlib.md5(str(version).encode()).hexdigest()}"'
+        _etag["loaded_at"] = now
+
+    return _etag["value"]
+
+
+class ClientCacheMiddleware:
+    # Plain ASGI middleware: every other path passes straight through
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in CLIENT_CACHED_PATHS
+        ):
+            return await self.app(scope, receive, send)
+
+        etag = await current_etag()
+        if etag is None:
+            return await self.app(scope, receive, send)
+
+        headers = {"ETag": etag, "Cache-Control": CLIENT_CACHE_CONTROL}
+
+        # Unchanged since the client's copy: skip the DB and serialisation
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        if etag in (t.strip() for t in if_none_match.split(",")):
+            response = Response(status_code=304, headers=headers)
+            return await response(scope, receive, send)
+
+        # Handlers only start a 200 once their query has succeeded (the
+        # GeoJSON stream reads its first batch first), so a failed request
+        # is never marked public-cacheable
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+app.add_middleware(ClientCacheMiddleware)
+
+# =========================
+# CORS (added last so it stays outermost and covers 304s too)
 # =========================
 app.add_middleware(
     CORSMiddleware,
@@ -25,95 +456,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
 # =========================
-# DB Session Dependency
+# Known Estuaries
 # =========================
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Each worker reloads the estuary name set this often, so a DELETE /cache
+# handled by another worker is picked up
+KNOWN_ESTUARIES_REFRESH = 300
+
+_known_estuaries = {"names": frozenset()}
+
+
+async def load_known_estuaries(db: AsyncSession):
+    names = (await db.execute(_SQL_ESTUARY_NAMES)).scalars().all()
+    _known_estuaries["names"] = frozenset(names)
+    return names
+
+
+async def refresh_known_estuaries():
+    while True:
+        await asyncio.sleep(KNOWN_ESTUARIES_REFRESH)
+        try:
+            async with SessionLocal() as db:
+                await load_known_estuaries(db)
+        except Exception:
+            logger.warning("Could not reload estuary names", exc_info=True)
+
+
+def is_known_estuary(estuary):
+    # Only real estuaries get a long-lived last-good SWR entry; arbitrary
+    # path values would otherwise leave a Redis hash behind for a week
+    return estuary in _known_estuaries["names"]
 
 
 # =========================
 # GET ALL POINTS (JSON)
 # =========================
-@app.get("/survey-points", response_model=list[SurveyPointBase])
-def read_points(db: Session = Depends(get_db)):
-    return db.query(SurveyPoints).all()
+@app.get("/survey-points")
+@swr_cache(fresh=POINTS_TTL, stale=0)
+async def read_points(db: AsyncSession = Depends(get_db)):
+    result = (await db.execute(_SQL_SURVEY_POINTS)).scalar()
+
+    return ORJSONResponse(content=result)
 
 
 # =========================
 # GET POINTS GEOJSON
 # =========================
-@app.get("/survey/points/geojson")
-def get_points_geojson(db: Session = Depends(get_db)):
-    sql = text("""
-        SELECT jsonb_build_object(
-            'type', 'FeatureCollection',
-            'features', jsonb_agg(
-                jsonb_build_object(
-                    'type', 'Feature',
-                    'geometry', ST_AsGeoJSON(geom)::jsonb,
-                    'properties', to_jsonb(survey_points) - 'geom'
-                )
-            )
-        ) AS geojson
-        FROM survey.survey_points;
-    """)
-    result = db.execute(sql).scalar()
+async def _stream_features(first, batches):
+    # Server-side cursor; only one batch of features is held at a time
+    yield '{"type": "FeatureCollection", "features": ['
+    yield ",".join(first)
+    sep = "," if first else ""
+    async for batch in batches:
+        yield sep + ",".join(batch)
+        sep = ","
+    yield "]}"
+
 
-    if not result:
-        return {"type": "FeatureCollection", "features": []}
+@app.get("/survey/points/geojson")
+async def get_points_geojson(db: AsyncSession = Depends(get_db)):
+    # Run the query and read the first batch before the 200 (and the
+    # ClientCacheMiddleware ETag/Cache-Control headers) goes out, so a
+    # missing view or a DB outage is a normal, uncached 500
+    result = await db.stream(_SQL_POINT_FEATURES)
+    batches = result.scalars().partitions(GEOJSON_BATCH_SIZE)
+    first = await anext(batches, [])
 
-    return JSONResponse(content=result)
+    return StreamingResponse(_stream_features(first, batches), media_type="application/json")
 
 
 # =========================
 # GET ESTUARY ABUNDANCE
 # =========================
-@app.get("/estuaries/{estuary_name}")
-def get_estuary_data(estuary_name: str, db: Session = Depends(get_db)):
-    sql = text("""
-        SELECT
-            sp.point_id,
-            sp.station_code,
-            sp.latitude,
-            sp.longitude,
-            pa.water_abundance,
-            pa.sediment_abundance
-        FROM survey.survey_points sp
-        LEFT JOIN survey.plastic_abundance pa
-            ON sp.station_code = pa.station_code
-        WHERE sp.estuary_name = :estuary_name
-    """)
-    rows = db.execute(sql, {"estuary_name": estuary_name}).fetchall()
-
-    if not rows:
-        return {"error": "No points found"}
+@app.get("/estuaries/{estuary}")
+@swr_cache(retain_if=is_known_estuary)
+async def get_estuary_data(estuary: str, db: AsyncSession = Depends(get_db)):
+    row = (await db.execute(_SQL_ESTUARY_DATA, {"estuary": estuary})).mappings().one()
 
-    water_values = [r.water_abundance for r in rows if r.water_abundance is not None]
-    sediment_values = [r.sediment_abundance for r in rows if r.sediment_abundance is not None]
+    if not row["n"]:
+        return {"error": "No points found"}
 
     return {
-        "average_water_abundance": (
-            sum(water_values) / len(water_values) if water_values else None
-        ),
-        "average_sediment_abundance": (
-            sum(sediment_values) / len(sediment_values) if sediment_values else None
-        ),
-        "points": [
-            {
-                "point_id": r.point_id,
-                "station_code": r.station_code,
-                "latitude": r.latitude,
-                "longitude": r.longitude,
-                "water_abundance": r.water_abundance,
-                "sediment_abundance": r.sediment_abundance,
-            }
-            for r in rows
-        ],
+        "average_water_abundance": row["average_water_abundance"],
+        "average_sediment_abundance": row["average_sediment_abundance"],
+        "points": row["points"],
     }
 
 
@@ -138,193 +565,84 @@ def root():
 # ESTUARY SHAPE
 # =========================
 @app.get("/estuaries/{estuary}/shape")
-def get_estuary_shape(estuary: str, db: Session = Depends(get_db)):
-    sql = text("""
-        SELECT
-            sp.station_code,
-            sp.latitude,
-            sp.longitude,
-            w.fiber   AS water_fiber,
-            w.fragment AS water_fragment,
-            w.film    AS water_film,
-            w.foam    AS water_foam,
-            w.pellet  AS water_pellet,
-            s.fiber   AS sediment_fiber,
-            s.fragment AS sediment_fragment,
-            s.film    AS sediment_film,
-            s.foam    AS sediment_foam,
-            s.pellet  AS sediment_pellet
-        FROM survey.survey_points sp
-        JOIN survey.plastic_shape_water w
-            ON sp.station_code = w.station_code
-        JOIN survey.plastic_shape_sediment s
-            ON sp.station_code = s.station_code
-        WHERE sp.estuary_name = :estuary;
-    """)
-    rows = db.execute(sql, {"estuary": estuary}).mappings().all()
-
-    if not rows:
-        return {"estuary": estuary, "points": [], "average": {}}
-
-    points = []
-    water_sum = dict(fiber=0, fragment=0, film=0, foam=0, pellet=0)
-    sediment_sum = dict(fiber=0, fragment=0, film=0, foam=0, pellet=0)
-
-    for r in rows:
-        points.append({
-            "station_code": r["station_code"],
-            "latitude": r["latitude"],
-            "longitude": r["longitude"],
-            "water": {
-                "fiber": r["water_fiber"],
-                "fragment": r["water_fragment"],
-                "film": r["water_film"],
-                "foam": r["water_foam"],
-                "pellet": r["water_pellet"],
-            },
-            "sediment": {
-                "fiber": r["sediment_fiber"],
-                "fragment": r["sediment_fragment"],
-                "film": r["sediment_film"],
-                "foam": r["sediment_foam"],
-                "pellet": r["sediment_pellet"],
-            },
-        })
-
-        for k in water_sum:
-            water_sum[k] += r[f"water_{k}"]
-            sediment_sum[k] += r[f"sediment_{k}"]
-
-    n = len(rows)
-    average = {
-        "water": {k: round(water_sum[k] / n, 2) for k in water_sum},
-        "sediment": {k: round(sediment_sum[k] / n, 2) for k in sediment_sum},
-    }
+@swr_cache(retain_if=is_known_estuary)
+async def get_estuary_shape(estuary: str, db: AsyncSession = Depends(get_db)):
+    result = (await db.execute(_SQL_ESTUARY_SHAPE, {"estuary": estuary})).scalar()
 
-    return {
-        "estuary": estuary,
-        "points": points,
-        "average": average,
-    }
+    return ORJSONResponse(content=result)
 
 
 # =========================
 # ESTUARY COLOR
 # =========================
 @app.get("/estuaries/{estuary}/color")
-def get_estuary_color(estuary: str, db: Session = Depends(get_db)):
-    sql = text("""
-        SELECT
-            sp.station_code,
-            sp.latitude,
-            sp.longitude,
-            cw.black AS w_black,
-            cw.red AS w_red,
-            cw.blue AS w_blue,
-            cw.yellow AS w_yellow,
-            cw.grey AS w_grey,
-            cw.white AS w_white,
-            cw.green AS w_green,
-            cw.orange AS w_orange,
-            cw.brown AS w_brown,
-            cw.transparent AS w_transparent,
-            cs.black AS s_black,
-            cs.red AS s_red,
-            cs.blue AS s_blue,
-            cs.yellow AS s_yellow,
-            cs.grey AS s_grey,
-            cs.white AS s_white,
-            cs.green AS s_green,
-            cs.orange AS s_orange,
-            cs.brown AS s_brown,
-            cs.transparent AS s_transparent
-        FROM survey.survey_points sp
-        LEFT JOIN survey.plastic_color_water cw
-            ON sp.station_code = cw.station_code
-        LEFT JOIN survey.plastic_color_sediment cs
-            ON sp.station_code = cs.station_code
-        WHERE sp.estuary_name = :estuary
-        ORDER BY sp.station_code;
-    """)
-    rows = db.execute(sql, {"estuary": estuary}).mappings().all()
-
-    points = []
-    for r in rows:
-        points.append({
-            "station_code": r["station_code"],
-            "latitude": r["latitude"],
-            "longitude": r["longitude"],
-            "water": {
-                "black": r["w_black"],
-                "red": r["w_red"],
-                "blue": r["w_blue"],
-                "yellow": r["w_yellow"],
-                "grey": r["w_grey"],
-                "white": r["w_white"],
-                "green": r["w_green"],
-                "orange": r["w_orange"],
-                "brown": r["w_brown"],
-                "transparent": r["w_transparent"],
-            },
-            "sediment": {
-                "black": r["s_black"],
-                "red": r["s_red"],
-                "blue": r["s_blue"],
-                "yellow": r["s_yellow"],
-                "grey": r["s_grey"],
-                "white": r["s_white"],
-                "green": r["s_green"],
-                "orange": r["s_orange"],
-                "brown": r["s_brown"],
-                "transparent": r["s_transparent"],
-            },
-        })
-
-    return {"estuary": estuary, "points": points}
+@swr_cache(retain_if=is_known_estuary)
+async def get_estuary_color(estuary: str, db: AsyncSession = Depends(get_db)):
+    rows = (await db.execute(_SQL_ESTUARY_COLOR, {"estuary": estuary})).fetchall()
+
+    points = [
+        ColorPoint(r[0], r[1], r[2], ColorBreakdown(*r[3:13]), ColorBreakdown(*r[13:23]))
+        for r in rows
+    ]
+
+    return Response(
+        content=_json_encoder.encode(EstuaryColor(estuary, points)),
+        media_type="application/json",
+    )
 
 
 # =========================
 # ESTUARY SIZE
 # =========================
 @app.get("/estuaries/{estuary}/size")
-def get_size_distribution(estuary: str, db: Session = Depends(get_db)):
-    sql = text("""
-        SELECT
-            sp.station_code,
-            sp.latitude,
-            sp.longitude,
-            sw.lt_1mm AS w_lt_1mm,
-            sw.mm_1_to_2_5 AS w_mm_1_to_2_5,
-            sw.mm_2_5_to_5 AS w_mm_2_5_to_5,
-            ss.lt_1mm AS s_lt_1mm,
-            ss.mm_1_to_2_5 AS s_mm_1_to_2_5,
-            ss.mm_2_5_to_5 AS s_mm_2_5_to_5
-        FROM survey.survey_points sp
-        LEFT JOIN survey.plastic_size_water sw
-            ON sp.station_code = sw.station_code
-        LEFT JOIN survey.plastic_size_sediment ss
-            ON sp.station_code = ss.station_code
-        WHERE sp.estuary_name = :estuary
-        ORDER BY sp.station_code;
-    """)
-    rows = db.execute(sql, {"estuary": estuary}).mappings().all()
-
-    points = []
-    for r in rows:
-        points.append({
-            "station_code": r["station_code"],
-            "latitude": r["latitude"],
-            "longitude": r["longitude"],
-            "water": {
-                "lt_1mm": r["w_lt_1mm"] or 0,
-                "mm_1_to_2_5": r["w_mm_1_to_2_5"] or 0,
-                "mm_2_5_to_5": r["w_mm_2_5_to_5"] or 0,
-            },
-            "sediment": {
-                "lt_1mm": r["s_lt_1mm"] or 0,
-                "mm_1_to_2_5": r["s_mm_1_to_2_5"] or 0,
-                "mm_2_5_to_5": r["s_mm_2_5_to_5"] or 0,
-            },
-        })
-
-    return {"estuary": estuary, "points": points}
\ No newline at end of file
+@swr_cache(retain_if=is_known_estuary)
+async def get_size_distribution(estuary: str, db: AsyncSession = Depends(get_db)):
+    rows = (await db.execute(_SQL_ESTUARY_SIZE, {"estuary": estuary})).fetchall()
+
+    points = [
+        SizePoint(r[0], r[1], r[2], SizeBreakdown(*r[3:6]), SizeBreakdown(*r[6:9]))
+        for r in rows
+    ]
+
+    return Response(
+        content=_json_encoder.encode(EstuarySize(estuary, points)),
+        media_type="application/json",
+    )
+
+
+# =========================
+# ESTUARY SHAPE + COLOR + SIZE
+# =========================
+@app.get("/estuaries/{estuary}/all")
+@swr_cache(retain_if=is_known_estuary)
+async def get_estuary_all(estuary: str, db: AsyncSession = Depends(get_db)):
+    result = (await db.execute(_SQL_ESTUARY_ALL, {"estuary": estuary})).scalar()
+
+    return ORJSONResponse(content=result)
+
+
+# =========================
+# WARM-UP
+# =========================
+async def warm_up():
+    # Background task: the worker serves traffic meanwhile, and a cold
+    # DB/Redis only costs the warm-up
+    try:
+        await warm_pool()
+        await warm_cache()
+    except Exception:
+        logger.warning("Startup warm-up failed", exc_info=True)
+
+
+async def warm_cache():
+    await read_points.warm()
+
+    async with SessionLocal() as db:
+        estuaries = await load_known_estuaries(db)
+
+    for estuary in estuaries:
+        await get_estuary_data.warm(estuary=estuary)
+        await get_estuary_shape.warm(estuary=estuary)
+        await get_estuary_color.warm(estuary=estuary)
+        await get_size_distribution.warm(estuary=estuary)
+        await get_estuary_all.warm(estuary=estuary)
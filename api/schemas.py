@@ -1,5 +1,7 @@
+import msgspec
 from pydantic import BaseModel
 from datetime import date
+from decimal import Decimal
 
 class SurveyPointBase(BaseModel):
     estuary_id: int | None = None
@@ -14,3 +16,50 @@ class SurveyPoint(SurveyPointBase):
 
     class Config:
         orm_mode = True
+
+
+# msgspec structs for the per-station breakdown endpoints; encoded straight
+# to JSON without Pydantic. Field order matches the SQL column order.
+class ColorBreakdown(msgspec.Struct):
+    black: int | None
+    red: int | None
+    blue: int | None
+    yellow: int | None
+    grey: int | None
+    white: int | None
+    green: int | None
+    orange: int | None
+    brown: int | None
+    transparent: int | None
+
+
+class ColorPoint(msgspec.Struct):
+    station_code: str | None
+    latitude: Decimal | None
+    longitude: Decimal | None
+    water: ColorBreakdown
+    sediment: ColorBreakdown
+
+
+class SizeBreakdown(msgspec.Struct):
+    lt_1mm: int
+    mm_1_to_2_5: int
+    mm_2_5_to_5: int
+
+
+class SizePoint(msgspec.Struct):
+    station_code: str | None
+    latitude: Decimal | None
+    longitude: Decimal | None
+    water: SizeBreakdown
+    sediment: SizeBreakdown
+
+
+class EstuaryColor(msgspec.Struct):
+    estuary: str
+    points: list[ColorPoint]
+
+
+class EstuarySize(msgspec.Struct):
+    estuary: str
+    points: list[SizePoint]
@@ -0,0 +1,28 @@
+-- Indexes for the filter/join columns used by api/main.py
+-- Apply with: psql "$DATABASE_URL" -f sql/001_indexes.sql
+
+-- survey_points: spatial column, estuary filter, station join key
+CREATE INDEX IF NOT EXISTS survey_points_geom_gix
+    ON survey.survey_points USING GIST (geom);
+CREATE INDEX IF NOT EXISTS survey_points_estuary_idx
+    ON survey.survey_points (estuary_name);
+CREATE INDEX IF NOT EXISTS survey_points_station_idx
+    ON survey.survey_points (station_code);
+
+-- per-station measurement tables, all joined on station_code
+CREATE INDEX IF NOT EXISTS plastic_abundance_station_idx
+    ON survey.plastic_abundance (station_code);
+CREATE INDEX IF NOT EXISTS plastic_shape_water_station_idx
+    ON survey.plastic_shape_water (station_code);
+CREATE INDEX IF NOT EXISTS plastic_shape_sediment_station_idx
+    ON survey.plastic_shape_sediment (station_code);
+CREATE INDEX IF NOT EXISTS plastic_color_water_station_idx
+    ON survey.plastic_color_water (station_code);
+CREATE INDEX IF NOT EXISTS plastic_color_sediment_station_idx
+    ON survey.plastic_color_sediment (station_code);
+CREATE INDEX IF NOT EXISTS plastic_size_water_station_idx
+    ON survey.plastic_size_water (station_code);
+CREATE INDEX IF NOT EXISTS plastic_size_sediment_station_idx
+    ON survey.plastic_size_sediment (station_code);
+
+ANALYZE survey.survey_points;
@@ -0,0 +1,22 @@
+-- Pre-built FeatureCollection served by /survey/points/geojson
+-- Refresh after each data load (DELETE /cache does this):
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY survey.survey_points_geojson;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS survey.survey_points_geojson AS
+SELECT
+    1 AS id,
+    jsonb_build_object(
+        'type', 'FeatureCollection',
+        'features', coalesce(jsonb_agg(
+            jsonb_build_object(
+                'type', 'Feature',
+                'geometry', ST_AsGeoJSON(geom)::jsonb,
+                'properties', to_jsonb(survey_points) - 'geom'
+            )
+        ), '[]'::jsonb)
+    ) AS geojson
+FROM survey.survey_points;
+
+-- REFRESH ... CONCURRENTLY needs a unique index
+CREATE UNIQUE INDEX IF NOT EXISTS survey_points_geojson_id_idx
+    ON survey.survey_points_geojson (id);
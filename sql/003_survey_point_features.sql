@@ -0,0 +1,21 @@
+-- One pre-rendered GeoJSON Feature per survey point, streamed by
+-- /survey/points/geojson. Replaces the single-row collection view from
+-- 002 so the API can stream features instead of buffering the whole body.
+-- Refresh after each data load (DELETE /cache does this):
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY survey.survey_point_features;
+
+DROP MATERIALIZED VIEW IF EXISTS survey.survey_points_geojson;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS survey.survey_point_features AS
+SELECT
+    point_id AS id,
+    jsonb_build_object(
+        'type', 'Feature',
+        'geometry', ST_AsGeoJSON(geom)::jsonb,
+        'properties', to_jsonb(survey_points) - 'geom'
+    )::text AS feature
+FROM survey.survey_points;
+
+-- REFRESH ... CONCURRENTLY needs a unique index
+CREATE UNIQUE INDEX IF NOT EXISTS survey_point_features_id_idx
+    ON survey.survey_point_features (id);
@@ -0,0 +1,11 @@
+-- Single-row counter bumped on every data load (DELETE /cache does this).
+-- The API derives the ETag of its static-ish endpoints from it.
+
+CREATE TABLE IF NOT EXISTS survey.data_version (
+    id         integer PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version    bigint NOT NULL DEFAULT 1,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO survey.data_version (id) VALUES (1)
+ON CONFLICT (id) DO NOTHING;
@@ -1,10 +1,14 @@
+import asyncio
+
 from sqlalchemy import text
-from api.database import SessionLocal
+from api.database import SessionLocal, engine
+
+
+async def main():
+    async with SessionLocal() as db:
+        result = (await db.execute(text("SELECT * FROM survey.survey_points LIMIT 1"))).fetchall()
+        print(result)
+    await engine.dispose()
 
-db = SessionLocal()
 
-try:
-    result = db.execute(text("SELECT * FROM survey.survey_points LIMIT 1")).fetchall()
-    print(result)
-finally:
-    db.close()
+asyncio.run(main())